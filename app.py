@@ -9,6 +9,7 @@ from sound_detector import SoundDetector
 from audio_capture import AudioCapture
 import os
 import time
+import logging
 
 API_ENDPOINT = os.environ.get("BASE_URL")
 app = Flask(__name__)
@@ -62,7 +63,21 @@ def capture_and_encode_image(image_capturer):
     return image_capturer.capture_image()
 
 
+def configure_logging():
+    # No-op for the root logger when the hosting process (e.g. a WSGI runner) already configured logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(name)s %(levelname)s %(message)s",
+    )
+    if os.environ.get("DEBUG", "").lower() == "true":
+        # Only our detection modules; a DEBUG root logger would also enable numba's compiler IR dumps
+        # and librosa/urllib3/slack_sdk debug output
+        for logger_name in ("sound_detector", "dtw_analyzer"):
+            logging.getLogger(logger_name).setLevel(logging.DEBUG)
+
+
 def initialize_services(app, servo_controller, image_capturer):
+    configure_logging()
     otp_manager = OTPManager(expiry_seconds=30)
     notifier, notifier_type = create_notifier_from_env()
 
@@ -91,6 +106,7 @@ def initialize_services(app, servo_controller, image_capturer):
         reference_audio_path=reference_audio_path,
         similarity_threshold=0.82,  # Higher threshold since 0=match, 1=no match
         detection_duration=0.2,
+        background_processing=True,
     )
     detector.set_detection_callback(on_detection)
     
@@ -109,6 +125,14 @@ def initialize_services(app, servo_controller, image_capturer):
 
     app.otp_manager = otp_manager
     app.servo_controller = servo_controller
+    app.audio_capture = audio_capture
+    app.detector = detector
+
+
+def shutdown_services(app):
+    # Stop feeding audio first so that no chunk is handed to the detector after its processing thread stops
+    app.audio_capture.stop_capture()
+    app.detector.stop()
 
 @app.route('/unlock', methods=['GET'])
 def unlock():
@@ -157,4 +181,4 @@ if __name__ == '__main__':
         try:
             app.run(host='0.0.0.0', port=5000, debug=False)
         finally:
-            pass
+            shutdown_services(app)
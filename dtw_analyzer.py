@@ -1,8 +1,68 @@
+import time
+import logging
 import numpy as np
 import librosa
+import numba
 from typing import Optional, Tuple
 import os
-from scipy.spatial.distance import euclidean
+
+logger = logging.getLogger(__name__)
+
+# Read once at import, calculate_similarity runs for every processed audio chunk
+DEBUG = os.getenv('DEBUG', '').lower() == 'true'
+
+# STFT size used for MFCC extraction (librosa's default)
+MFCC_N_FFT = 2048
+
+
+# fastmath without the 'nnan'/'ninf' flags, since the DTW matrix is initialized with infinity
+@numba.njit(cache=True, fastmath={'contract', 'arcp', 'nsz', 'afn'}, boundscheck=False)
+def _dtw_fill(seq1: np.ndarray, seq2: np.ndarray, window_constraint: int, diagonals: np.ndarray) -> float:
+    """
+    Compute the DTW distance with a Sakoe-Chiba band by sweeping anti-diagonals of the accumulated cost matrix
+    
+    Cells on one anti-diagonal (i + j = k) only depend on the two previous anti-diagonals, so they are
+    independent of each other and only three rows of length len(seq1) + 1, indexed by i, are kept in
+    the preallocated diagonals array of shape (3, len(seq1) + 1).
+    """
+    n, m = seq1.shape[0], seq2.shape[0]
+    num_features = seq1.shape[1]
+    
+    prev2 = diagonals[0]  # anti-diagonal k - 2
+    prev1 = diagonals[1]  # anti-diagonal k - 1
+    cur = diagonals[2]    # anti-diagonal k
+    prev2[:] = np.inf
+    prev2[0] = 0.0
+    prev1[:] = np.inf
+    
+    for k in range(2, n + m + 1):
+        cur[:] = np.inf
+        
+        # Rows on this anti-diagonal inside the matrix and the window band |i - j| <= window_constraint
+        i_start = max(max(1, k - m), (k - window_constraint + 1) // 2)
+        i_end = min(min(n, k - 1), (k + window_constraint) // 2)
+        
+        for i in range(i_start, i_end + 1):
+            j = k - i
+            
+            # Euclidean distance between current features
+            cost = 0.0
+            for f in range(num_features):
+                diff = float(seq1[i-1, f]) - float(seq2[j-1, f])
+                cost += diff * diff
+            cost = np.sqrt(cost)
+            
+            # DTW recurrence relation
+            cur[i] = cost + min(
+                prev1[i-1],    # insertion
+                prev1[i],      # deletion
+                prev2[i-1]     # match
+            )
+        
+        prev2, prev1, cur = prev1, cur, prev2
+    
+    return prev1[n]
+
 
 class DTWAnalyzer:
     def __init__(self, reference_audio: np.ndarray, sample_rate: int = 44100, 
@@ -20,28 +80,43 @@ class DTWAnalyzer:
         self.window_constraint_ratio = window_constraint_ratio
         self.downsample_factor = downsample_factor
         
+        # librosa.feature.mfcc rebuilds the mel filterbank on every call, so build it once for this sample rate
+        self._mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=MFCC_N_FFT)
+        
         # Extract and store reference features
         self.reference_features = self.extract_features(reference_audio)
         
+        # Reference waveform for cross-correlation, its FFT is computed once the query length is known
+        self._reference_audio = np.asarray(reference_audio, dtype=np.float32)
+        self._reference_norm = float(np.linalg.norm(self._reference_audio))
+        self._xcorr_nfft = 0
+        self._reference_fft_conj = np.array([])
+        
+        # Anti-diagonal buffers for DTW, reused across calls while the sequence length stays the same
+        self._dtw_diagonals = np.empty((3, 0))
+        
     
     def extract_features(self, audio_data: np.ndarray) -> np.ndarray:
         """Extract MFCC features from audio data"""
         if len(audio_data) == 0:
             return np.array([])
             
-        # Ensure audio_data is float32 for librosa
-        audio_data = audio_data.astype(np.float32)
+        # Ensure audio_data is float32 for librosa (no copy when it already is)
+        audio_data = np.asarray(audio_data, dtype=np.float32)
         
         # Normalize to [-1, 1] range for consistent feature extraction
-        max_val = np.max(np.abs(audio_data))
+        # (peak magnitude from max/min avoids allocating an np.abs temporary)
+        max_val = max(audio_data.max(), -audio_data.min())
         if max_val > 0:
             audio_data = audio_data / max_val
         else:
             return []
         
-        # Extract MFCC features
+        # Extract MFCC features (same as librosa.feature.mfcc(y=...), but with the cached mel filterbank)
+        power_spectrum = np.abs(librosa.stft(audio_data, n_fft=MFCC_N_FFT, hop_length=512)) ** 2
+        mel_spectrum = np.einsum("...ft,mf->...mt", power_spectrum, self._mel_basis, optimize=True)
         mfcc_features = librosa.feature.mfcc(
-            y=audio_data, sr=self.sample_rate, n_mfcc=13, hop_length=512
+            S=librosa.power_to_db(mel_spectrum), n_mfcc=13
         ).T  # Transpose to get time x features
         
         # Downsample features for faster processing
@@ -67,28 +142,12 @@ class DTWAnalyzer:
         if window_constraint is None:
             window_constraint = max(1, int(max(n, m) * self.window_constraint_ratio))
         
-        # Initialize DTW matrix with infinity
-        dtw_matrix = np.full((n + 1, m + 1), np.inf)
-        dtw_matrix[0, 0] = 0
+        # Reuse the anti-diagonal buffers from the previous call when the sequence length is unchanged
+        if self._dtw_diagonals.shape[1] != n + 1:
+            self._dtw_diagonals = np.empty((3, n + 1))
         
         # Fill DTW matrix with Sakoe-Chiba band constraint
-        for i in range(1, n + 1):
-            # Calculate window bounds
-            j_start = max(1, i - window_constraint)
-            j_end = min(m + 1, i + window_constraint + 1)
-            
-            for j in range(j_start, j_end):
-                # Calculate distance between current features
-                cost = euclidean(seq1[i-1], seq2[j-1])
-                
-                # DTW recurrence relation
-                dtw_matrix[i, j] = cost + min(
-                    dtw_matrix[i-1, j],      # insertion
-                    dtw_matrix[i, j-1],      # deletion
-                    dtw_matrix[i-1, j-1]     # match
-                )
-                
-        return dtw_matrix[n, m]
+        return _dtw_fill(seq1, seq2, window_constraint, self._dtw_diagonals)
     
     def calculate_similarity_features(self, seq1_features: np.ndarray, seq2_features: np.ndarray) -> float:
         """
@@ -122,7 +181,7 @@ class DTWAnalyzer:
             return similarity_score
             
         except Exception as e:
-            print(f"DTW calculation error: {e}")
+            logger.error("DTW calculation error: %s", e)
             return 1.0  # Return max dissimilarity on error
     
     
@@ -136,20 +195,50 @@ class DTWAnalyzer:
         Returns:
             similarity_score: Float between 0 and 1 (0 = perfect match, 1 = no similarity)
         """
-        import time
-        
         # Extract features from input audio pattern
-        feature_start = time.time()
+        if DEBUG:
+            feature_start = time.time()
         pattern_features = self.extract_features(audio_pattern)
-        feature_time = time.time() - feature_start
         
         # Compare with stored reference features
-        dtw_start = time.time()
+        if DEBUG:
+            dtw_start = time.time()
         similarity = self.calculate_similarity_features(pattern_features, self.reference_features)
-        dtw_time = time.time() - dtw_start
         
-        if os.getenv('DEBUG', '').lower() == 'true':
-            print(f"  DTW breakdown: features={feature_time*1000:.1f}ms, dtw_calc={dtw_time*1000:.1f}ms")
+        if DEBUG:
+            feature_time = dtw_start - feature_start
+            dtw_time = time.time() - dtw_start
+            logger.debug("  DTW breakdown: features=%.1fms, dtw_calc=%.1fms", feature_time*1000, dtw_time*1000)
         
         return similarity
-    
+
+    def calculate_similarity_xcorr(self, audio_pattern: np.ndarray) -> float:
+        """
+        Calculate similarity between audio pattern and reference using FFT-based normalized cross-correlation
+        
+        Much cheaper than DTW (one forward and one inverse FFT per call) and tolerant to time shifts,
+        but unlike DTW it does not tolerate the reference being played faster or slower.
+        
+        Args:
+            audio_pattern: Audio pattern as numpy array
+            
+        Returns:
+            similarity_score: Float between 0 and 1 (0 = perfect match, 1 = no similarity)
+        """
+        pattern_norm = float(np.linalg.norm(audio_pattern))
+        if pattern_norm == 0 or self._reference_norm == 0:
+            return 1.0  # Return max dissimilarity for silent audio
+        
+        # Zero-pad to a power of two long enough for the circular correlation to equal the linear one
+        correlation_length = len(audio_pattern) + len(self._reference_audio) - 1
+        nfft = 1 << (correlation_length - 1).bit_length()
+        if nfft != self._xcorr_nfft:
+            self._xcorr_nfft = nfft
+            self._reference_fft_conj = np.conj(np.fft.rfft(self._reference_audio, n=nfft))
+        
+        pattern_fft = np.fft.rfft(np.asarray(audio_pattern, dtype=np.float32), n=nfft)
+        correlation = np.fft.irfft(pattern_fft * self._reference_fft_conj, n=nfft)
+        
+        # Peak correlation over all time shifts, 1 when the pattern contains exactly the reference
+        peak = correlation.max() / (pattern_norm * self._reference_norm)
+        return float(np.clip(1 - peak, 0.0, 1.0))
@@ -1,12 +1,28 @@
 import time
+import logging
+import threading
 import numpy as np
 import librosa
 import os
-from typing import Callable
-from collections import deque
+from typing import Callable, Optional, Tuple
 from dtw_analyzer import DTWAnalyzer
 from datetime import datetime, time as datetime_time
 
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between "detected but throttled" log messages
+THROTTLE_LOG_INTERVAL = 5.0
+
+# Similarity distance above the threshold within which every chunk is processed to catch the onset of a match
+ADAPTIVE_INTERVAL_MARGIN = 0.1
+
+# Read once at import, process_audio_chunk is called for every audio chunk
+DEBUG = os.getenv('DEBUG', '').lower() == 'true'
+
+# Number of log-spaced frequency bands in the spectral fingerprint used to pre-screen audio before DTW
+FINGERPRINT_BANDS = 32
+FINGERPRINT_MIN_FREQ = 50.0
+
 
 class SoundDetector:
     def __init__(self, 
@@ -19,6 +35,14 @@ class SoundDetector:
                  enable_time_pause: bool = True,
                  pause_start_hour: int = 22,  # 10 PM
                  pause_end_hour: int = 8,     # 8 AM
+                 fingerprint_gate_threshold: Optional[float] = None,
+                 similarity_cache_tolerance: Optional[float] = None,
+                 dtw_downsample_factor: int = 1,
+                 background_processing: bool = False,
+                 pause_check_interval: float = 60.0,
+                 dtw_analyzer: Optional[DTWAnalyzer] = None,
+                 adaptive_processing_interval: bool = False,
+                 similarity_method: str = 'dtw',
         ):
         """
         Initialize DTW-based sound detector for microphone input
@@ -33,7 +57,27 @@ class SoundDetector:
             enable_time_pause: Whether to pause detection during specified hours
             pause_start_hour: Hour to start pause (24-hour format, default 22 for 10 PM)
             pause_end_hour: Hour to end pause (24-hour format, default 8 for 8 AM)
+            fingerprint_gate_threshold: Spectral fingerprint distance (0=same spectral shape, 2=opposite) above which
+                audio is rejected without running DTW (None disables the pre-screen)
+            similarity_cache_tolerance: Fingerprint distance below which the previous non-matching DTW similarity is
+                reused instead of running DTW again (None disables the cache)
+            dtw_downsample_factor: Keep every N-th MFCC frame before DTW to shrink the DTW matrix by N^2
+            background_processing: Run pattern detection on a dedicated thread so that process_audio_chunk only
+                buffers audio and never blocks the audio capture thread on DTW
+            pause_check_interval: Seconds to reuse the last pause window check before reading the clock again
+            dtw_analyzer: Prebuilt DTW analyzer for the same reference audio and sample rate, reused instead of
+                extracting the reference features again (cannot be combined with dtw_downsample_factor)
+            adaptive_processing_interval: Process every chunk while the similarity is close to the threshold and
+                relax back to the processing interval when it is far from it (only saves CPU when the buffer slack
+                spans several chunks)
+            similarity_method: 'dtw' for MFCC-based DTW, or 'xcorr' for FFT cross-correlation of the waveforms,
+                which is much cheaper but does not tolerate tempo changes (similarity_threshold needs retuning)
         """
+        if similarity_method not in ('dtw', 'xcorr'):
+            raise ValueError(f"similarity_method must be 'dtw' or 'xcorr', got {similarity_method!r}")
+        if dtw_analyzer is not None and dtw_downsample_factor != 1:
+            raise ValueError("dtw_downsample_factor cannot be set when passing a prebuilt dtw_analyzer")
+        
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.similarity_threshold = similarity_threshold
@@ -42,22 +86,66 @@ class SoundDetector:
         self.enable_time_pause = enable_time_pause
         self.pause_start_hour = pause_start_hour
         self.pause_end_hour = pause_end_hour
+        self.pause_check_interval = pause_check_interval
+        self.fingerprint_gate_threshold = fingerprint_gate_threshold
+        self.similarity_cache_tolerance = similarity_cache_tolerance
+        self.adaptive_processing_interval = adaptive_processing_interval
+        self.similarity_method = similarity_method
         
         # Load reference audio file
         self.reference_audio, _ = librosa.load(reference_audio_path, sr=sample_rate)
+        # Keep audio in float32 end to end (matches the microphone stream) to avoid float64 promotion downstream
+        self.reference_audio = self.reference_audio.astype(np.float32, copy=False)
         self.reference_duration = len(self.reference_audio) / sample_rate
         
-        self.dtw_analyzer = DTWAnalyzer(sample_rate=sample_rate, reference_audio=self.reference_audio)
+        if dtw_analyzer is None:
+            dtw_analyzer = DTWAnalyzer(
+                sample_rate=sample_rate,
+                reference_audio=self.reference_audio,
+                downsample_factor=dtw_downsample_factor,
+            )
+        self.dtw_analyzer = dtw_analyzer
         
         self.detection_callback = None
         self.pattern_detection_times = []
         self.last_detection_time = 0
+        self._last_throttle_log_time = 0
         self.chunk_counter = 0
+        self._pause_window_cache = (float('-inf'), False)  # (monotonic time checked at, in pause window)
         self.processing_interval = int(os.getenv('PROCESSING_INTERVAL', '2'))  # Process every N chunks
+        self._adaptive_interval = self.processing_interval
         
         # Audio buffer to store latest n seconds of audio data (+1 second because beginning of buffer does not necessarily matches perfectly with the beginning of reference sound)
+        # It is kept as a preallocated ring buffer so that buffering a chunk is a plain memory copy.
+        # Every sample is written twice, at i and i + buffer_size, so the latest samples are always a
+        # contiguous slice and reading the buffer in order never needs a copy.
         self.buffer_size = int((self.reference_duration + 1) * sample_rate)
-        self.audio_buffer = deque(maxlen=self.buffer_size)
+        self.audio_buffer = np.zeros(2 * self.buffer_size, dtype=np.float32)
+        self._write_index = 0
+        self._buffered_samples = 0
+        
+        # Longest processing interval that still evaluates every position of the reference within the buffer slack
+        self._max_relaxed_interval = max(1, (self.buffer_size - len(self.reference_audio)) // chunk_size)
+        
+        # Spectral fingerprint of the reference, compared against the buffer as a cheap pre-screen before DTW
+        self._reference_fingerprint = self._compute_fingerprint(
+            self.reference_audio, *self._prepare_fingerprint(len(self.reference_audio))
+        )
+        self._buffer_fingerprint_params = self._prepare_fingerprint(self.buffer_size)
+        
+        # Fingerprint and similarity of the last DTW run, reused while the buffer barely changes
+        self._cached_fingerprint = None
+        self._cached_similarity = None
+        
+        # The audio thread writes into the ring buffer while the processing thread snapshots it
+        self._buffer_lock = threading.Lock()
+        self._detection_requested = threading.Event()
+        self._stop_requested = threading.Event()
+        self._processing_thread = None
+        if background_processing:
+            self._snapshot_buffer = np.empty(self.buffer_size, dtype=np.float32)
+            self._processing_thread = threading.Thread(target=self._processing_loop, daemon=True)
+            self._processing_thread.start()
         
     def set_detection_callback(self, callback: Callable[[], None]):
         """Set callback function to be called with detection result (True/False)"""
@@ -67,63 +155,206 @@ class SoundDetector:
         """Check if current time is within the pause window (10pm-8am by default)"""
         if not self.enable_time_pause:
             return False
+        
+        # The pause window only changes on hour boundaries, so reuse the last check instead of
+        # building a datetime for every audio chunk. The cache age uses the monotonic clock so that a wall
+        # clock step (e.g. an NTP correction) cannot keep a stale decision alive beyond the check interval.
+        now = time.monotonic()
+        checked_at, in_pause_window = self._pause_window_cache
+        if now - checked_at < self.pause_check_interval:
+            return in_pause_window
             
-        current_time = datetime.now()
-        current_hour = current_time.hour
+        current_hour = self._current_hour()
         
         # Handle case where pause spans midnight (e.g., 22:00 to 08:00)
         if self.pause_start_hour > self.pause_end_hour:
             # Pause window crosses midnight
-            return current_hour >= self.pause_start_hour or current_hour < self.pause_end_hour
+            in_pause_window = current_hour >= self.pause_start_hour or current_hour < self.pause_end_hour
         else:
             # Pause window is within same day
-            return self.pause_start_hour <= current_hour < self.pause_end_hour
+            in_pause_window = self.pause_start_hour <= current_hour < self.pause_end_hour
+        
+        self._pause_window_cache = (now, in_pause_window)
+        return in_pause_window
+
+    def _current_hour(self) -> int:
+        """Return the current local hour (0-23) used to decide the pause window"""
+        return datetime.now().hour
+
+    def _prepare_fingerprint(self, num_samples: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Precompute the window, band index and band size used to fingerprint num_samples of audio"""
+        freqs = np.fft.rfftfreq(num_samples, 1 / self.sample_rate)
+        band_edges = np.geomspace(FINGERPRINT_MIN_FREQ, self.sample_rate / 2, FINGERPRINT_BANDS + 1)
+        band_index = np.clip(np.searchsorted(band_edges, freqs, side='right') - 1, 0, FINGERPRINT_BANDS - 1)
+        band_sizes = np.maximum(np.bincount(band_index, minlength=FINGERPRINT_BANDS), 1)
+        return np.hanning(num_samples).astype(np.float32), band_index, band_sizes
+
+    def _compute_fingerprint(self, audio_data: np.ndarray, window: np.ndarray,
+                             band_index: np.ndarray, band_sizes: np.ndarray) -> np.ndarray:
+        """Compute a unit-length log band energy vector describing the spectral shape of audio_data"""
+        magnitude = np.abs(np.fft.rfft(audio_data * window))
+        band_energy = np.bincount(band_index, weights=magnitude, minlength=FINGERPRINT_BANDS) / band_sizes
+        fingerprint = np.log(band_energy + 1e-10)
+        fingerprint -= np.mean(fingerprint)
+        norm = np.linalg.norm(fingerprint)
+        if norm > 0:
+            fingerprint /= norm
+        return fingerprint
+
+    def _append_to_buffer(self, audio_data: np.ndarray):
+        """Write audio samples into the ring buffer, keeping only the latest buffer_size samples"""
+        num_samples = len(audio_data)
+        if num_samples >= self.buffer_size:
+            self.audio_buffer[:self.buffer_size] = audio_data[-self.buffer_size:]
+            self.audio_buffer[self.buffer_size:] = audio_data[-self.buffer_size:]
+            self._write_index = 0
+            self._buffered_samples = self.buffer_size
+            return
+
+        start = self._write_index
+        end = start + num_samples
+        if end <= self.buffer_size:
+            self.audio_buffer[start:end] = audio_data
+            self.audio_buffer[start + self.buffer_size:end + self.buffer_size] = audio_data
+        else:
+            # Wrap around to the beginning of the ring buffer
+            split = self.buffer_size - start
+            self.audio_buffer[start:self.buffer_size] = audio_data[:split]
+            self.audio_buffer[start + self.buffer_size:] = audio_data[:split]
+            self.audio_buffer[:end - self.buffer_size] = audio_data[split:]
+            self.audio_buffer[self.buffer_size:end] = audio_data[split:]
+        self._write_index = end % self.buffer_size
+        self._buffered_samples = min(self._buffered_samples + num_samples, self.buffer_size)
+
+    def _get_buffered_audio(self) -> np.ndarray:
+        """Return a view of the buffered audio samples in chronological order"""
+        end = self._write_index + self.buffer_size
+        return self.audio_buffer[end - self._buffered_samples:end]
         
     def process_audio_chunk(self, audio_data: np.ndarray):
         """Process incoming audio chunk and return detection result"""
-        start_time = time.time()
+        if DEBUG:
+            start_time = time.time()
         
-        if not self.detection_callback:
+        callback = self.detection_callback
+        if callback is None:
             return
             
         # Check if we're in the pause window (10pm-8am)
         if self._is_in_pause_window():
-            if os.getenv('DEBUG', '').lower() == 'true':
-                print(f"Audio processing paused (time-based pause: {self.pause_start_hour}:00-{self.pause_end_hour}:00)")
+            logger.debug("Audio processing paused (time-based pause: %d:00-%d:00)",
+                         self.pause_start_hour, self.pause_end_hour)
             return
         
         # Add new audio data to buffer (always)
-        buffer_start = time.time()
-        self.audio_buffer.extend(audio_data)
-        buffer_time = time.time() - buffer_start
+        if DEBUG:
+            buffer_start = time.time()
+        with self._buffer_lock:
+            self._append_to_buffer(audio_data)
+        if DEBUG:
+            buffer_time = time.time() - buffer_start
         
         # Skip processing some chunks to reduce CPU load
-        self.chunk_counter = (self.chunk_counter + 1) % self.processing_interval
+        self.chunk_counter = (self.chunk_counter + 1) % self._adaptive_interval
         if self.chunk_counter != 0:
-            if os.getenv('DEBUG', '').lower() == 'true':
-                print(f"Skipping chunk {self.chunk_counter} (interval={self.processing_interval})")
+            logger.debug("Skipping chunk %d (interval=%d)", self.chunk_counter, self._adaptive_interval)
+            return
+        
+        if self._processing_thread is not None:
+            # Hand detection off to the processing thread so the audio thread never waits for DTW
+            self._detection_requested.set()
             return
         
-        # Pattern detection timing
-        detection_start = time.time()
-        detected = self._detect_pattern_similarity(np.array(list(self.audio_buffer)))
-        detection_time = time.time() - detection_start
+        # Pattern detection timing (only measured when debugging to keep time.time() off the hot path)
+        if DEBUG:
+            detection_start = time.time()
+        detected = self._detect_buffered_pattern()
+        if DEBUG:
+            detection_time = time.time() - detection_start
+            total_time = time.time() - start_time
+            logger.debug("Audio processing: buffer=%.1fms, detection=%.1fms, total=%.1fms",
+                         buffer_time*1000, detection_time*1000, total_time*1000)
         
-        total_time = time.time() - start_time
-        if os.getenv('DEBUG', '').lower() == 'true':
-            print(f"Audio processing: buffer={buffer_time*1000:.1f}ms, detection={detection_time*1000:.1f}ms, total={total_time*1000:.1f}ms")
+        if detected:
+            self._notify_detection(callback)
+    
+    def _processing_loop(self):
+        """Run pattern detection whenever the audio thread requests it, until stop() is called"""
+        while not self._stop_requested.is_set():
+            if not self._detection_requested.wait(timeout=0.5):
+                continue
+            self._detection_requested.clear()
+            if self._stop_requested.is_set():
+                break
+            
+            # The callback may be cleared at any time, and calling None would kill this thread silently
+            callback = self.detection_callback
+            if callback is None:
+                continue
+            
+            if self._detect_buffered_pattern():
+                self._notify_detection(callback)
+    
+    def stop(self):
+        """Stop the background processing thread, if one is running"""
+        if self._processing_thread is None:
+            return
         
-        if not detected:
+        self._stop_requested.set()
+        self._detection_requested.set()
+        self._processing_thread.join(timeout=1.0)
+        if self._processing_thread.is_alive():
+            # A DTW run is still in progress; keep routing chunks to the (exiting) thread rather than
+            # detecting on the audio thread concurrently with it
+            logger.warning("Processing thread did not stop within 1 second")
             return
-
+        self._processing_thread = None
+    
+    def _detect_buffered_pattern(self) -> bool:
+        """Snapshot the buffered audio and run pattern detection on it"""
+        if self._processing_thread is None:
+            return self._detect_pattern_similarity(self._get_buffered_audio())
+        
+        # The audio thread keeps writing while DTW runs, so detect on a copy taken under the lock
+        with self._buffer_lock:
+            audio_buffer = self._get_buffered_audio()
+            snapshot = self._snapshot_buffer[:len(audio_buffer)]
+            snapshot[:] = audio_buffer
+        return self._detect_pattern_similarity(snapshot)
+    
+    def _notify_detection(self, callback: Callable[[], None]):
+        """Invoke the detection callback unless a detection was reported within the throttle duration"""
         current_time = time.time()
         if current_time - self.last_detection_time >= self.throttle_duration:
             self.last_detection_time = current_time
-            self.detection_callback()
-        else:
-            print(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "Detected by throttled")
+            callback()
+        elif current_time - self._last_throttle_log_time >= THROTTLE_LOG_INTERVAL:
+            # A ringing intercom matches on many consecutive chunks, so only log the throttling occasionally
+            self._last_throttle_log_time = current_time
+            logger.info("Detected by throttled")
             
     
+    def _adapt_processing_interval(self, similarity: float):
+        """Process every chunk while similarity is close to the threshold, and back off when it is far from it"""
+        if not self.adaptive_processing_interval:
+            return
+        
+        if similarity - self.similarity_threshold < ADAPTIVE_INTERVAL_MARGIN:
+            self._adaptive_interval = 1
+        else:
+            self._relax_processing_interval()
+    
+    def _relax_processing_interval(self):
+        """Back off to the relaxed processing interval after audio that is clearly not the reference"""
+        if not self.adaptive_processing_interval:
+            return
+        
+        # Never relax below the configured interval, nor beyond what the buffer slack can absorb
+        self._adaptive_interval = max(
+            self.processing_interval,
+            min(2 * self.processing_interval, self._max_relaxed_interval)
+        )
+            
     def _detect_pattern_similarity(self, audio_buffer: np.ndarray) -> bool:
         """
         Detect pattern similarity using DTW with sustained detection logic
@@ -136,9 +367,35 @@ class SoundDetector:
         """
         if len(audio_buffer) < self.buffer_size:
             return False
-            
-        similarity = self.dtw_analyzer.calculate_similarity(audio_buffer)
-        print(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "similarity", similarity)
+        
+        fingerprint = None
+        if self.fingerprint_gate_threshold is not None or self.similarity_cache_tolerance is not None:
+            fingerprint = self._compute_fingerprint(audio_buffer, *self._buffer_fingerprint_params)
+        
+        if self.fingerprint_gate_threshold is not None:
+            # Reject audio whose spectral shape is far from the reference without running the expensive DTW
+            fingerprint_distance = 1 - float(fingerprint @ self._reference_fingerprint)
+            if fingerprint_distance > self.fingerprint_gate_threshold:
+                self._relax_processing_interval()
+                return False
+        
+        if (self.similarity_cache_tolerance is not None and self._cached_fingerprint is not None
+                and np.linalg.norm(fingerprint - self._cached_fingerprint) < self.similarity_cache_tolerance):
+            similarity = self._cached_similarity
+        else:
+            if self.similarity_method == 'xcorr':
+                similarity = self.dtw_analyzer.calculate_similarity_xcorr(audio_buffer)
+            else:
+                similarity = self.dtw_analyzer.calculate_similarity(audio_buffer)
+            if self.similarity_cache_tolerance is not None:
+                if similarity <= self.similarity_threshold:
+                    # Never reuse a match so that every detection comes from a fresh DTW run
+                    self._cached_fingerprint = None
+                else:
+                    self._cached_fingerprint = fingerprint
+                    self._cached_similarity = similarity
+        logger.debug("similarity %.3f", similarity)
+        self._adapt_processing_interval(similarity)
         if similarity <= self.similarity_threshold:
             return True
         
@@ -1,42 +1,109 @@
 import unittest
+import functools
+import io
 import numpy as np
-import tempfile
-import os
-import librosa
 import soundfile as sf
-from dtw_analyzer import DTWAnalyzer
+import librosa
+from dtw_analyzer import DTWAnalyzer, _dtw_fill
 
 SAMPLE_RATE = 44100
 
+@functools.cache
 def generate_base_pattern():
     # Create a simple audio pattern (440Hz + 880Hz tones)
     duration = 1.0
-    t = np.linspace(0, duration, int(SAMPLE_RATE * duration), False)
+    # float32 like microphone and librosa audio
+    t = np.linspace(0, duration, int(SAMPLE_RATE * duration), False, dtype=np.float32)
     
     # Create a pattern with two tones
-    pattern = (np.sin(2 * np.pi * 440 * t) + 0.5 * np.sin(2 * np.pi * 880 * t))
+    pattern = np.sin(2 * np.pi * 440 * t) + 0.5 * np.sin(2 * np.pi * 880 * t)
 
+    # The cached pattern is shared between tests, so guard it against accidental modification
+    pattern.setflags(write=False)
     return pattern
 
 
-class TestDTWAnalyzer(unittest.TestCase):
-    
-    @classmethod
-    def setUpClass(cls):
-        """Create a temporary reference audio file for testing."""
-        # Generate a test reference audio file (440Hz + 880Hz tones)
-        cls.temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-        cls.temp_file.close()
+@functools.cache
+def _load_roundtrip(sample_rate):
+    """Encode the base pattern as a 16-bit WAV file in memory and load it back with librosa.load like SoundDetector"""
+    wav_file = io.BytesIO()
+    sf.write(wav_file, generate_base_pattern(), sample_rate, format='WAV')
+    wav_file.seek(0)
+    loaded_audio, _ = librosa.load(wav_file, sr=sample_rate)
+
+    loaded_audio.setflags(write=False)
+    return loaded_audio
 
-        cls.pattern = generate_base_pattern()
+
+def _reference_dtw(seq1, seq2, window_constraint):
+    """Textbook DTW over the full accumulated cost matrix with a Sakoe-Chiba band |i - j| <= window_constraint"""
+    n, m = len(seq1), len(seq2)
+    cost_matrix = np.full((n + 1, m + 1), np.inf)
+    cost_matrix[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - window_constraint), min(m, i + window_constraint) + 1):
+            cost = np.linalg.norm(seq1[i-1] - seq2[j-1])
+            cost_matrix[i, j] = cost + min(cost_matrix[i-1, j], cost_matrix[i, j-1], cost_matrix[i-1, j-1])
+    return cost_matrix[n, m]
+
+
+class TestDTWFill(unittest.TestCase):
+    
+    def test_dtw_fill_matches_full_matrix_dtw_within_window_band(self):
+        """Test the anti-diagonal DTW kernel against a plain nested-loop DTW for narrow and unequal bands."""
+        rng = np.random.default_rng(0)
+        # (len(seq1), len(seq2), window_constraint)
+        test_cases = [
+            (1, 1, 1),
+            (10, 10, 0),   # diagonal only
+            (20, 20, 1),
+            (20, 20, 3),
+            (15, 22, 7),
+            (22, 15, 7),
+            (8, 11, 3),    # |n - m| == window, band just reaches the corner
+            (25, 25, 30),  # window wider than the matrix
+        ]
         
-        # Save to file using soundfile
-        sf.write(cls.temp_file.name, cls.pattern, SAMPLE_RATE)
+        for n, m, window_constraint in test_cases:
+            with self.subTest(n=n, m=m, window_constraint=window_constraint):
+                seq1 = rng.standard_normal((n, 13))
+                seq2 = rng.standard_normal((m, 13))
+                
+                distance = _dtw_fill(seq1, seq2, window_constraint, np.empty((3, n + 1)))
+                
+                self.assertAlmostEqual(distance, _reference_dtw(seq1, seq2, window_constraint), places=9)
+    
+    def test_dtw_fill_with_sequences_lagging_at_band_edge_respects_window(self):
+        """Test the band edges exactly, using sequences whose best alignment lags by window_constraint +/- 1."""
+        rng = np.random.default_rng(2)
+        n, window_constraint = 30, 3
+        
+        for lag in (window_constraint, window_constraint + 1):
+            base = rng.standard_normal((n + lag, 13))
+            # seq1[i] == seq2[i + lag], so the cheapest path runs along the diagonal j - i = lag
+            leading, lagging = base[lag:], base[:n]
+            for seq1, seq2 in ((leading, lagging), (lagging, leading)):
+                with self.subTest(lag=lag, seq1_leads=seq1 is leading):
+                    distance = _dtw_fill(seq1, seq2, window_constraint, np.empty((3, n + 1)))
+                    
+                    self.assertAlmostEqual(distance, _reference_dtw(seq1, seq2, window_constraint), places=9)
+    
+    def test_dtw_fill_with_length_difference_beyond_window_returns_inf(self):
+        """Test sequences whose length difference exceeds the window have no admissible warping path."""
+        rng = np.random.default_rng(1)
         
-    @classmethod
-    def tearDownClass(cls):
-        """Clean up temporary file."""
-        os.unlink(cls.temp_file.name)
+        for n, m, window_constraint in [(30, 12, 5), (12, 30, 5), (9, 5, 3)]:
+            with self.subTest(n=n, m=m, window_constraint=window_constraint):
+                seq1 = rng.standard_normal((n, 13))
+                seq2 = rng.standard_normal((m, 13))
+                
+                distance = _dtw_fill(seq1, seq2, window_constraint, np.empty((3, n + 1)))
+                
+                self.assertEqual(distance, np.inf)
+                self.assertEqual(_reference_dtw(seq1, seq2, window_constraint), np.inf)
+
+
+class TestDTWAnalyzer(unittest.TestCase):
     
     def test_initialization_with_reference_audio_sets_sample_rate(self):
         """Test that DTW analyzer initializes correctly."""
@@ -81,8 +148,8 @@ class TestDTWAnalyzer(unittest.TestCase):
     
     def test_calculate_similarity_between_synthetic_and_loaded_audio_returns_low_value(self):
         """Test similarity between synthetic and loaded audio."""
-        # Load audio from file
-        loaded_audio, _ = librosa.load(self.temp_file.name, sr=SAMPLE_RATE)
+        # Reference audio after an in-memory WAV encode and librosa.load round trip
+        loaded_audio = _load_roundtrip(SAMPLE_RATE)
         analyzer = DTWAnalyzer(
             reference_audio=loaded_audio,
             sample_rate=SAMPLE_RATE,
@@ -95,6 +162,36 @@ class TestDTWAnalyzer(unittest.TestCase):
         # the similarity is not zero, maybe the pattern is modified on the course of WAV transformation
         self.assertLess(similarity, 0.5)
     
+    def test_calculate_similarity_xcorr_with_shifted_identical_audio_returns_zero(self):
+        """Test cross-correlation similarity of the reference embedded in silence."""
+        analyzer = DTWAnalyzer(
+            reference_audio=generate_base_pattern(),
+            sample_rate=SAMPLE_RATE,
+        )
+        
+        # Reference delayed by half a second inside a longer buffer
+        pattern = np.zeros(int(SAMPLE_RATE * 2.0))
+        offset = SAMPLE_RATE // 2
+        pattern[offset:offset + SAMPLE_RATE] = generate_base_pattern()
+        
+        similarity = analyzer.calculate_similarity_xcorr(pattern)
+        self.assertAlmostEqual(similarity, 0.0, places=4)
+    
+    def test_calculate_similarity_xcorr_with_different_audio_returns_high_value(self):
+        """Test cross-correlation similarity with non-matching audio."""
+        analyzer = DTWAnalyzer(
+            reference_audio=generate_base_pattern(),
+            sample_rate=SAMPLE_RATE,
+        )
+        
+        # Generate different audio (2000Hz tone)
+        t = np.linspace(0, 1.0, SAMPLE_RATE, False)
+        different_pattern = np.sin(2 * np.pi * 2000 * t)
+        
+        similarity = analyzer.calculate_similarity_xcorr(different_pattern)
+        self.assertGreater(similarity, 0.5)
+        self.assertLessEqual(similarity, 1.0)
+    
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
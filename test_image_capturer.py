@@ -1,19 +1,36 @@
 import unittest
-from unittest.mock import Mock, patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock, mock_open
 import tempfile
 import os
+from types import SimpleNamespace
 from image_capturer import ImageCapturer
 
+# Stand-ins for subprocess.CompletedProcess, ImageCapturer only reads returncode
+_OK_RESULT = SimpleNamespace(returncode=0)
+_FAILED_RESULT = SimpleNamespace(returncode=1)
+
+# Built once; mock_open re-serves read_data on every open() call
+_MOCK_OPEN = mock_open(read_data=b'fake_image_data')
+
 
 class TestImageCapturer(unittest.TestCase):
     """Test cases for ImageCapturer class"""
 
-    @patch('subprocess.run')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake_image_data')
+    def setUp(self):
+        """Patch fswebcam invocations once per test instead of decorating every method"""
+        patcher = patch('subprocess.run')
+        self.mock_run = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clear recorded calls on the shared open() mock"""
+        _MOCK_OPEN.reset_mock()
+
+    @patch('builtins.open', _MOCK_OPEN)
     @patch('os.path.exists')
-    def test_capture_image_returns_bytes(self, mock_exists, mock_file, mock_run):
+    def test_capture_image_returns_bytes(self, mock_exists):
         """Test that capture_image returns image bytes from fswebcam"""
-        mock_run.return_value = Mock(returncode=0)
+        self.mock_run.return_value = _OK_RESULT
         mock_exists.return_value = True
 
         capturer = ImageCapturer()
@@ -21,35 +38,32 @@ class TestImageCapturer(unittest.TestCase):
 
         self.assertIsNotNone(image_bytes)
         self.assertEqual(image_bytes, b'fake_image_data')
-        mock_run.assert_called_once()
+        self.mock_run.assert_called_once()
 
-    @patch('subprocess.run')
-    def test_capture_image_returns_none_on_failure(self, mock_run):
+    def test_capture_image_returns_none_on_failure(self):
         """Test that capture_image returns None when fswebcam fails"""
-        mock_run.return_value = Mock(returncode=1)
+        self.mock_run.return_value = _FAILED_RESULT
 
         capturer = ImageCapturer()
         image_bytes = capturer.capture_image()
 
         self.assertIsNone(image_bytes)
 
-    @patch('subprocess.run')
     @patch('os.path.exists')
-    def test_save_image_creates_file(self, mock_exists, mock_run):
+    def test_save_image_creates_file(self, mock_exists):
         """Test that save_image successfully saves to specified path"""
-        mock_run.return_value = Mock(returncode=0)
+        self.mock_run.return_value = _OK_RESULT
         mock_exists.return_value = True
 
         capturer = ImageCapturer()
         result = capturer.save_image('/tmp/test.jpg')
 
         self.assertTrue(result)
-        mock_run.assert_called_once()
+        self.mock_run.assert_called_once()
 
-    @patch('subprocess.run')
-    def test_save_image_returns_false_on_failure(self, mock_run):
+    def test_save_image_returns_false_on_failure(self):
         """Test that save_image returns False when fswebcam fails"""
-        mock_run.return_value = Mock(returncode=1)
+        self.mock_run.return_value = _FAILED_RESULT
 
         capturer = ImageCapturer()
         result = capturer.save_image('/tmp/test.jpg')
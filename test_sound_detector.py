@@ -1,25 +1,90 @@
 import unittest
+import copy
 import numpy as np
-import time
 import os
-from unittest.mock import MagicMock, patch
-from datetime import datetime
+import time
+import threading
+from unittest.mock import patch
 from sound_detector import SoundDetector
 
+# Seeded noise generated once for the whole module; the detector only reads its input, so tests share it.
+# Unlike silence it has a non-degenerate spectral fingerprint, so fingerprint comparisons are meaningful.
+_SCRATCH = np.random.default_rng(0).standard_normal(1 << 20, dtype=np.float32)
+_SCRATCH.setflags(write=False)
+
+
+def _fake_audio(num_samples, offset=0):
+    """Return a read-only view of num_samples of noise, starting offset samples into the shared stream"""
+    if offset + num_samples > len(_SCRATCH):
+        raise ValueError(f"{num_samples} samples at offset {offset} exceed the {len(_SCRATCH)}-sample scratch buffer")
+    return _SCRATCH[offset:offset + num_samples]
+
+
+# Stand-in chunk for tests that mock pattern detection, where the audio content is never inspected
+_TINY = _fake_audio(4)
+
+
+class CallCounter:
+    """Minimal detection callback stub that only records how often it was called."""
+    __slots__ = ('called', 'count')
+
+    def __init__(self):
+        self.called = False
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.called = True
+        self.count += 1
+
 
 class TestSoundDetector(unittest.TestCase):
     
-    def setUp(self):
-        """Set up test fixtures with reference audio file."""
-        self.reference_audio_path = "reference_intercom.wav"
-        # Verify reference file exists
-        self.assertTrue(os.path.exists(self.reference_audio_path), 
-                       f"Reference audio file {self.reference_audio_path} not found")
+    @classmethod
+    def setUpClass(cls):
+        """Check the reference audio file and load it once; most tests start from a copy of this detector."""
+        cls.reference_audio_path = "reference_intercom.wav"
+        # Skip rather than error out where the binary fixture is not checked out
+        if not os.path.exists(cls.reference_audio_path):
+            raise unittest.SkipTest(f"Reference audio file {cls.reference_audio_path} not found")
+        
+        cls._template = SoundDetector(reference_audio_path=cls.reference_audio_path)
+        
+        # Noise buffers for tests that mock the DTW analyzer; the fingerprint tests also rely on their content
+        cls._full_buffer = _fake_audio(cls._template.buffer_size)
+        cls._small_buffer = _fake_audio(cls._template.buffer_size - 100)
+    
+    def _fresh_detector(self, **overrides):
+        """Copy the template detector with the given attributes overridden and all runtime state reset.
+        
+        Only plain attributes can be overridden; tests of constructor-derived state build a real SoundDetector.
+        """
+        detector = copy.copy(self._template)
+        for name, value in overrides.items():
+            if not hasattr(detector, name):
+                raise AttributeError(f"SoundDetector has no attribute {name!r}")
+            setattr(detector, name, value)
+        
+        detector.detection_callback = None
+        detector.pattern_detection_times = []
+        detector.last_detection_time = 0
+        detector._last_throttle_log_time = 0
+        detector.chunk_counter = 0
+        detector._pause_window_cache = (float('-inf'), False)
+        detector._adaptive_interval = detector.processing_interval
+        detector.audio_buffer = np.zeros_like(self._template.audio_buffer)
+        detector._write_index = 0
+        detector._buffered_samples = 0
+        detector._cached_fingerprint = None
+        detector._cached_similarity = None
+        detector._buffer_lock = threading.Lock()
+        detector._detection_requested = threading.Event()
+        detector._stop_requested = threading.Event()
+        return detector
     
     def test_set_detection_callback_stores_callback_function(self):
         """Test setting detection callback function."""
-        detector = SoundDetector(reference_audio_path=self.reference_audio_path)
-        callback = MagicMock()
+        detector = self._fresh_detector()
+        callback = CallCounter()
         
         detector.set_detection_callback(callback)
         
@@ -27,21 +92,20 @@ class TestSoundDetector(unittest.TestCase):
         
     def test_process_audio_chunk_without_callback_not_raise_error(self):
         """Test process_audio_chunk returns early when no callback is set."""
-        detector = SoundDetector(reference_audio_path=self.reference_audio_path)
+        detector = self._fresh_detector()
         
         # Generate some test audio data
-        audio_data = np.random.random(1024).astype(np.float32)
+        audio_data = _TINY
         
         # Should not raise an error
         detector.process_audio_chunk(audio_data)
         
     def test_process_audio_chunk_with_pattern_match_triggers_callback(self):
         """Test process_audio_chunk triggers callback when pattern matches."""
-        detector = SoundDetector(
-            reference_audio_path=self.reference_audio_path,
+        detector = self._fresh_detector(
             throttle_duration=0.1  # Very short throttle for testing
         )
-        callback = MagicMock()
+        callback = CallCounter()
         detector.set_detection_callback(callback)
         
         # Set the last detection time to a very old time to avoid throttling
@@ -50,41 +114,153 @@ class TestSoundDetector(unittest.TestCase):
         # Set chunk counter to ensure processing happens on first call
         detector.chunk_counter = detector.processing_interval - 1
         
-        # Mock pause window and pattern similarity
-        with patch.object(detector, '_is_in_pause_window', return_value=False):
-            with patch.object(detector, '_detect_pattern_similarity', return_value=True):
-                audio_data = np.random.random(1024).astype(np.float32)
-                detector.process_audio_chunk(audio_data)
-                
-                callback.assert_called_once()
+        # Stub out the pause window and pattern similarity on this detector copy only
+        detector._is_in_pause_window = lambda: False
+        detector._detect_pattern_similarity = lambda audio_buffer: True
+        
+        audio_data = _TINY
+        detector.process_audio_chunk(audio_data)
+        
+        self.assertEqual(callback.count, 1)
                 
-    def test_process_audio_chunk_within_throttle_duration_prevents_detection(self):
-        """Test that detection is throttled within throttle duration."""
+    @patch('sound_detector.time.time')
+    def test_process_audio_chunk_within_throttle_duration_prevents_detection(self, mock_time):
+        """Test that detection is throttled within throttle duration and allowed again once it has passed."""
+        detector = self._fresh_detector(
+            throttle_duration=10.0,
+            processing_interval=1  # Run detection on every chunk
+        )
+        callback = CallCounter()
+        detector.set_detection_callback(callback)
+        
+        # Fake clock that the test advances explicitly
+        now = [1000.0]
+        mock_time.side_effect = lambda: now[0]
+        
+        # Stub out the pause window and pattern similarity on this detector copy only
+        detector._is_in_pause_window = lambda: False
+        detector._detect_pattern_similarity = lambda audio_buffer: True
+        
+        audio_chunk = _TINY
+        
+        # Detection right after the last one should be throttled
+        detector.last_detection_time = now[0]
+        detector.process_audio_chunk(audio_chunk)
+        self.assertFalse(callback.called)
+        
+        # Once the throttle duration has passed, the callback runs again
+        now[0] += detector.throttle_duration + 1
+        detector.process_audio_chunk(audio_chunk)
+        self.assertEqual(callback.count, 1)
+        self.assertEqual(detector.last_detection_time, now[0])
+            
+    def test_process_audio_chunk_with_overflowing_audio_keeps_latest_samples(self):
+        """Test the audio buffer keeps the latest buffer_size samples in chronological order."""
+        detector = self._fresh_detector(
+            enable_time_pause=False
+        )
+        detector.set_detection_callback(CallCounter())
+        
+        # Push more audio than the buffer holds so that the ring buffer wraps around. A few large chunks
+        # cover every write path: a partial fill, a write that wraps, and a chunk longer than the buffer.
+        audio_data = np.arange(2 * detector.buffer_size + 1024, dtype=np.float32)
+        partial_fill = detector.buffer_size - 500
+        wrapped = partial_fill + 3000
+        detector._detect_pattern_similarity = lambda audio_buffer: False
+        
+        detector.process_audio_chunk(audio_data[:partial_fill])
+        detector.process_audio_chunk(audio_data[partial_fill:wrapped])
+        np.testing.assert_array_equal(detector._get_buffered_audio(),
+                                      audio_data[wrapped - detector.buffer_size:wrapped])
+        
+        detector.process_audio_chunk(audio_data[wrapped:])
+        
+        np.testing.assert_array_equal(detector._get_buffered_audio(), audio_data[-detector.buffer_size:])
+            
+    def test_process_audio_chunk_with_background_processing_triggers_callback(self):
+        """Test the processing thread runs detection and triggers the callback."""
         detector = SoundDetector(
             reference_audio_path=self.reference_audio_path,
-            throttle_duration=10.0
+            enable_time_pause=False,
+            background_processing=True,
+            dtw_analyzer=self._template.dtw_analyzer
         )
-        callback = MagicMock()
-        detector.set_detection_callback(callback)
+        self.addCleanup(detector.stop)
+        detected = threading.Event()
+        detector.set_detection_callback(detected.set)
+        detector.chunk_counter = detector.processing_interval - 1
         
-        # Set initial last detection time to force throttling on second call
-        detector.last_detection_time = time.time()
+        detector._detect_pattern_similarity = lambda audio_buffer: True
         
-        # Mock pause window and pattern similarity
-        with patch.object(detector, '_is_in_pause_window', return_value=False):
-            with patch.object(detector, '_detect_pattern_similarity', return_value=True):
-                audio_chunk = np.random.random(1024).astype(np.float32)
-                
-                # First detection should be throttled (since last_detection_time is recent)
-                detector.process_audio_chunk(audio_chunk)
-                callback.assert_not_called()
+        audio_data = _TINY
+        detector.process_audio_chunk(audio_data)
+        
+        self.assertTrue(detected.wait(timeout=2.0))
+            
+    def test_processing_loop_without_callback_keeps_running(self):
+        """Test the processing thread survives a detection request while no callback is set."""
+        detector = SoundDetector(
+            reference_audio_path=self.reference_audio_path,
+            enable_time_pause=False,
+            background_processing=True,
+            dtw_analyzer=self._template.dtw_analyzer
+        )
+        self.addCleanup(detector.stop)
+        detector._detect_pattern_similarity = lambda audio_buffer: True
+        
+        # Request detection directly, process_audio_chunk itself returns early without a callback
+        detector._detection_requested.set()
+        deadline = time.monotonic() + 2.0
+        while detector._detection_requested.is_set() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(detector._detection_requested.is_set())
+        
+        detected = threading.Event()
+        detector.set_detection_callback(detected.set)
+        detector.chunk_counter = detector.processing_interval - 1
+        detector.process_audio_chunk(_TINY)
+        
+        self.assertTrue(detected.wait(timeout=2.0))
+        self.assertTrue(detector._processing_thread.is_alive())
+        
+    def test_stop_during_slow_detection_keeps_processing_thread(self):
+        """Test stop() keeps the worker thread while a detection run is still in progress."""
+        detector = SoundDetector(
+            reference_audio_path=self.reference_audio_path,
+            enable_time_pause=False,
+            background_processing=True,
+            dtw_analyzer=self._template.dtw_analyzer
+        )
+        detector.set_detection_callback(CallCounter())
+        detector.chunk_counter = detector.processing_interval - 1
+        
+        started = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        
+        def slow_detection(audio_buffer):
+            started.set()
+            release.wait(timeout=5.0)
+            return False
+        detector._detect_pattern_similarity = slow_detection
+        
+        detector.process_audio_chunk(_TINY)
+        self.assertTrue(started.wait(timeout=2.0))
+        
+        # The join times out, so chunks must not fall back to detecting on the audio thread
+        detector.stop()
+        self.assertIsNotNone(detector._processing_thread)
+        
+        release.set()
+        detector.stop()
+        self.assertIsNone(detector._processing_thread)
             
     def test_detect_pattern_similarity_with_insufficient_buffer_returns_false(self):
         """Test _detect_pattern_similarity returns False when buffer is too small."""
-        detector = SoundDetector(reference_audio_path=self.reference_audio_path)
+        detector = self._fresh_detector()
         
         # Create audio buffer smaller than required buffer size
-        small_buffer = np.random.random(detector.buffer_size - 100).astype(np.float32)
+        small_buffer = self._small_buffer
         
         result = detector._detect_pattern_similarity(small_buffer)
         
@@ -92,10 +268,10 @@ class TestSoundDetector(unittest.TestCase):
         
     def test_detect_pattern_similarity_below_threshold_returns_true(self):
         """Test _detect_pattern_similarity returns True when pattern matches."""
-        detector = SoundDetector(reference_audio_path=self.reference_audio_path)
+        detector = self._fresh_detector()
         
         # Create audio buffer of correct size
-        audio_buffer = np.random.random(detector.buffer_size).astype(np.float32)
+        audio_buffer = self._full_buffer
         
         # Mock the DTW analyzer to return a match (similarity < threshold means match)
         with patch.object(detector.dtw_analyzer, 'calculate_similarity', return_value=0.2):
@@ -105,10 +281,10 @@ class TestSoundDetector(unittest.TestCase):
                 
     def test_detect_pattern_similarity_above_threshold_returns_false(self):
         """Test _detect_pattern_similarity returns False when pattern doesn't match."""
-        detector = SoundDetector(reference_audio_path=self.reference_audio_path)
+        detector = self._fresh_detector()
         
         # Create audio buffer of correct size
-        audio_buffer = np.random.random(detector.buffer_size).astype(np.float32)
+        audio_buffer = self._full_buffer
         
         # Mock the DTW analyzer to return no match (similarity > threshold means no match)
         with patch.object(detector.dtw_analyzer, 'calculate_similarity', return_value=0.9):
@@ -117,10 +293,141 @@ class TestSoundDetector(unittest.TestCase):
             self.assertFalse(result)
                 
         
+    def test_detect_pattern_similarity_with_xcorr_method_matches_reference(self):
+        """Test the cross-correlation similarity method is used instead of DTW and detects the reference."""
+        detector = self._fresh_detector(similarity_method='xcorr')
+        
+        audio_buffer = np.zeros(detector.buffer_size, dtype=np.float32)
+        audio_buffer[-len(detector.reference_audio):] = detector.reference_audio
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity') as mock_similarity:
+            self.assertTrue(detector._detect_pattern_similarity(audio_buffer))
+            self.assertFalse(detector._detect_pattern_similarity(self._full_buffer))
+            
+            mock_similarity.assert_not_called()
+        
+    def test_initialization_with_dtw_analyzer_and_downsample_factor_raises_value_error(self):
+        """Test that a downsample factor is not silently dropped when a prebuilt analyzer is passed."""
+        with self.assertRaises(ValueError):
+            SoundDetector(
+                reference_audio_path=self.reference_audio_path,
+                dtw_analyzer=self._template.dtw_analyzer,
+                dtw_downsample_factor=2
+            )
+        
+    def test_initialization_with_unknown_similarity_method_raises_value_error(self):
+        """Test that an unsupported similarity method is rejected."""
+        with self.assertRaises(ValueError):
+            SoundDetector(reference_audio_path=self.reference_audio_path, similarity_method='mfcc')
+        
+    def test_detect_pattern_similarity_with_fingerprint_gate_rejects_silence_without_dtw(self):
+        """Test the fingerprint gate rejects audio unlike the reference before running DTW."""
+        detector = self._fresh_detector(
+            fingerprint_gate_threshold=0.3
+        )
+        
+        silent_buffer = np.zeros(detector.buffer_size, dtype=np.float32)
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity', return_value=0.2) as mock_similarity:
+            result = detector._detect_pattern_similarity(silent_buffer)
+            
+            self.assertFalse(result)
+            mock_similarity.assert_not_called()
+                
+    def test_detect_pattern_similarity_with_fingerprint_gate_passes_reference_to_dtw(self):
+        """Test the fingerprint gate lets audio containing the reference through to DTW."""
+        detector = self._fresh_detector(
+            fingerprint_gate_threshold=0.3
+        )
+        
+        audio_buffer = np.zeros(detector.buffer_size, dtype=np.float32)
+        audio_buffer[-len(detector.reference_audio):] = detector.reference_audio
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity', return_value=0.2) as mock_similarity:
+            result = detector._detect_pattern_similarity(audio_buffer)
+            
+            self.assertTrue(result)
+            mock_similarity.assert_called_once()
+        
+    def test_detect_pattern_similarity_with_similarity_cache_reuses_result_only_within_tolerance(self):
+        """Test the cached DTW similarity is reused only while the fingerprint moved less than the tolerance."""
+        # The same noise stream advanced by 64 samples, like the buffer after a short stretch of audio
+        first_buffer = self._full_buffer
+        second_buffer = _fake_audio(self._template.buffer_size, offset=64)
+        fingerprint_params = self._template._buffer_fingerprint_params
+        distance = np.linalg.norm(self._template._compute_fingerprint(first_buffer, *fingerprint_params)
+                                  - self._template._compute_fingerprint(second_buffer, *fingerprint_params))
+        self.assertGreater(distance, 0)
+        
+        for tolerance, expected_dtw_runs in ((distance * 1.05, 1), (distance * 0.95, 2)):
+            with self.subTest(tolerance=tolerance):
+                detector = self._fresh_detector(similarity_cache_tolerance=tolerance)
+                
+                with patch.object(detector.dtw_analyzer, 'calculate_similarity',
+                                  return_value=0.9) as mock_similarity:
+                    self.assertFalse(detector._detect_pattern_similarity(first_buffer))
+                    self.assertFalse(detector._detect_pattern_similarity(second_buffer))
+                    
+                    self.assertEqual(mock_similarity.call_count, expected_dtw_runs)
+                
+    def test_detect_pattern_similarity_with_similarity_cache_does_not_reuse_match(self):
+        """Test a matching DTW similarity is never served from the cache."""
+        detector = self._fresh_detector(
+            similarity_cache_tolerance=0.02
+        )
+        
+        audio_buffer = self._full_buffer
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity', return_value=0.2) as mock_similarity:
+            self.assertTrue(detector._detect_pattern_similarity(audio_buffer))
+            self.assertTrue(detector._detect_pattern_similarity(audio_buffer))
+            
+            self.assertEqual(mock_similarity.call_count, 2)
+        
+    def test_detect_pattern_similarity_near_threshold_processes_every_chunk(self):
+        """Test a similarity close to the threshold switches to processing every chunk."""
+        detector = self._fresh_detector(adaptive_processing_interval=True)
+        
+        audio_buffer = self._full_buffer
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity',
+                          return_value=detector.similarity_threshold + 0.05):
+            detector._detect_pattern_similarity(audio_buffer)
+            self.assertEqual(detector._adaptive_interval, 1)
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity', return_value=1.0):
+            detector._detect_pattern_similarity(audio_buffer)
+            self.assertGreaterEqual(detector._adaptive_interval, detector.processing_interval)
+        
+    def test_detect_pattern_similarity_without_adaptive_interval_keeps_processing_interval(self):
+        """Test the processing interval is left alone unless adaptive processing is enabled."""
+        detector = self._fresh_detector()
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity',
+                          return_value=detector.similarity_threshold + 0.05):
+            detector._detect_pattern_similarity(self._full_buffer)
+            
+        self.assertEqual(detector._adaptive_interval, detector.processing_interval)
+        
+    def test_detect_pattern_similarity_with_fingerprint_gate_rejection_relaxes_interval(self):
+        """Test noise rejected by the fingerprint gate never switches to processing every chunk."""
+        detector = self._fresh_detector(
+            similarity_threshold=0.95,
+            fingerprint_gate_threshold=0.3,
+            adaptive_processing_interval=True
+        )
+        detector._adaptive_interval = 1
+        
+        with patch.object(detector.dtw_analyzer, 'calculate_similarity') as mock_similarity:
+            self.assertFalse(detector._detect_pattern_similarity(self._full_buffer))
+            mock_similarity.assert_not_called()
+            
+        self.assertGreaterEqual(detector._adaptive_interval, detector.processing_interval)
+        
     def test_process_audio_chunk_with_empty_data_does_not_crash(self):
         """Test handling of empty audio data."""
-        detector = SoundDetector(reference_audio_path=self.reference_audio_path)
-        callback = MagicMock()
+        detector = self._fresh_detector()
+        callback = CallCounter()
         detector.set_detection_callback(callback)
         
         empty_data = np.array([])
@@ -129,7 +436,7 @@ class TestSoundDetector(unittest.TestCase):
         detector.process_audio_chunk(empty_data)
         
         # Callback should not be called
-        callback.assert_not_called()
+        self.assertFalse(callback.called)
         
     def test_initialization_with_time_pause_enabled_sets_parameters(self):
         """Test SoundDetector initialization with time-based pause parameters."""
@@ -137,7 +444,8 @@ class TestSoundDetector(unittest.TestCase):
             reference_audio_path=self.reference_audio_path,
             enable_time_pause=True,
             pause_start_hour=22,
-            pause_end_hour=8
+            pause_end_hour=8,
+            dtw_analyzer=self._template.dtw_analyzer
         )
         
         self.assertTrue(detector.enable_time_pause)
@@ -148,15 +456,40 @@ class TestSoundDetector(unittest.TestCase):
         """Test that time-based pause can be disabled."""
         detector = SoundDetector(
             reference_audio_path=self.reference_audio_path,
-            enable_time_pause=False
+            enable_time_pause=False,
+            dtw_analyzer=self._template.dtw_analyzer
         )
         
         self.assertFalse(detector.enable_time_pause)
         
+    def test_initialization_with_dtw_analyzer_reuses_it(self):
+        """Test that a prebuilt DTW analyzer is used instead of building a new one."""
+        with patch('sound_detector.DTWAnalyzer') as mock_analyzer_class:
+            detector = SoundDetector(
+                reference_audio_path=self.reference_audio_path,
+                dtw_analyzer=self._template.dtw_analyzer
+            )
+            
+            mock_analyzer_class.assert_not_called()
+        self.assertIs(detector.dtw_analyzer, self._template.dtw_analyzer)
+        
+    def test_initialization_with_dtw_downsample_factor_configures_analyzer(self):
+        """Test that the DTW downsample factor is passed through to the DTW analyzer."""
+        detector = self._template
+        downsampled_detector = SoundDetector(
+            reference_audio_path=self.reference_audio_path,
+            dtw_downsample_factor=2
+        )
+        
+        self.assertEqual(downsampled_detector.dtw_analyzer.downsample_factor, 2)
+        self.assertEqual(
+            len(downsampled_detector.dtw_analyzer.reference_features),
+            (len(detector.dtw_analyzer.reference_features) + 1) // 2
+        )
+        
     def test_is_in_pause_window_when_disabled_returns_false(self):
         """Test _is_in_pause_window returns False when time pause is disabled."""
-        detector = SoundDetector(
-            reference_audio_path=self.reference_audio_path,
+        detector = self._fresh_detector(
             enable_time_pause=False,
             pause_start_hour=0,
             pause_end_hour=0
@@ -168,11 +501,11 @@ class TestSoundDetector(unittest.TestCase):
         
     def test_is_in_pause_window_spanning_midnight_correctly_identifies_hours(self):
         """Test _is_in_pause_window correctly handles pause window spanning midnight."""
-        detector = SoundDetector(
-            reference_audio_path=self.reference_audio_path,
+        detector = self._fresh_detector(
             enable_time_pause=True,
             pause_start_hour=22,  # 10 PM
-            pause_end_hour=8     # 8 AM
+            pause_end_hour=8,    # 8 AM
+            pause_check_interval=0  # Re-check the clock on every call
         )
         
         # Test various hours
@@ -187,20 +520,21 @@ class TestSoundDetector(unittest.TestCase):
             (22, True),   # 10 PM - should be paused
         ]
         
-        for hour, expected_paused in test_cases:
-            with patch('sound_detector.datetime') as mock_datetime:
-                mock_datetime.now.return_value.hour = hour
-                result = detector._is_in_pause_window()
-                self.assertEqual(result, expected_paused, 
-                               f"Hour {hour} should {'be paused' if expected_paused else 'not be paused'}")
+        with patch.object(detector, '_current_hour') as mock_current_hour:
+            for hour, expected_paused in test_cases:
+                with self.subTest(hour=hour):
+                    mock_current_hour.return_value = hour
+                    result = detector._is_in_pause_window()
+                    self.assertEqual(result, expected_paused,
+                                   f"Hour {hour} should {'be paused' if expected_paused else 'not be paused'}")
                 
     def test_is_in_pause_window_within_same_day_correctly_identifies_hours(self):
         """Test _is_in_pause_window for pause window within same day."""
-        detector = SoundDetector(
-            reference_audio_path=self.reference_audio_path,
+        detector = self._fresh_detector(
             enable_time_pause=True,
             pause_start_hour=14,  # 2 PM
-            pause_end_hour=18    # 6 PM
+            pause_end_hour=18,   # 6 PM
+            pause_check_interval=0  # Re-check the clock on every call
         )
         
         test_cases = [
@@ -212,17 +546,58 @@ class TestSoundDetector(unittest.TestCase):
             (19, False),  # 7 PM - should not be paused
         ]
         
-        for hour, expected_paused in test_cases:
-            with patch('sound_detector.datetime') as mock_datetime:
-                mock_datetime.now.return_value.hour = hour
-                result = detector._is_in_pause_window()
-                self.assertEqual(result, expected_paused,
-                               f"Hour {hour} should {'be paused' if expected_paused else 'not be paused'}")
+        with patch.object(detector, '_current_hour') as mock_current_hour:
+            for hour, expected_paused in test_cases:
+                with self.subTest(hour=hour):
+                    mock_current_hour.return_value = hour
+                    result = detector._is_in_pause_window()
+                    self.assertEqual(result, expected_paused,
+                                   f"Hour {hour} should {'be paused' if expected_paused else 'not be paused'}")
+                
+    def test_is_in_pause_window_within_check_interval_reuses_previous_result(self):
+        """Test _is_in_pause_window does not re-read the clock within the check interval."""
+        detector = self._fresh_detector(
+            enable_time_pause=True,
+            pause_start_hour=22,
+            pause_end_hour=8,
+            pause_check_interval=60.0
+        )
+        
+        with patch.object(detector, '_current_hour') as mock_current_hour:
+            mock_current_hour.return_value = 2
+            self.assertTrue(detector._is_in_pause_window())
+            
+            mock_current_hour.return_value = 12
+            self.assertTrue(detector._is_in_pause_window())
+            mock_current_hour.assert_called_once()
+                
+    @patch('sound_detector.time.time')
+    @patch('sound_detector.time.monotonic')
+    def test_is_in_pause_window_after_check_interval_rereads_hour_despite_wall_clock_step(self, mock_monotonic,
+                                                                                          mock_time):
+        """Test the pause window cache expires on the monotonic clock even if the wall clock steps back."""
+        detector = self._fresh_detector(
+            enable_time_pause=True,
+            pause_start_hour=22,
+            pause_end_hour=8,
+            pause_check_interval=60.0
+        )
+        
+        with patch.object(detector, '_current_hour') as mock_current_hour:
+            mock_monotonic.return_value = 1000.0
+            mock_time.return_value = 5000.0
+            mock_current_hour.return_value = 2
+            self.assertTrue(detector._is_in_pause_window())
+            
+            # Wall clock jumps back an hour while 61 seconds pass
+            mock_monotonic.return_value = 1061.0
+            mock_time.return_value = 5000.0 - 3600
+            mock_current_hour.return_value = 12
+            self.assertFalse(detector._is_in_pause_window())
                 
     def test_process_audio_chunk_during_pause_window_skips_detection(self):
         """Test that process_audio_chunk skips processing during pause window."""
-        detector = SoundDetector(
-            reference_audio_path=self.reference_audio_path,
+        detector = self._fresh_detector(
             enable_time_pause=True,
             pause_start_hour=22,
             pause_end_hour=8,
@@ -231,24 +606,22 @@ class TestSoundDetector(unittest.TestCase):
         detector.last_detection_time = 0
         detector.chunk_counter = detector.processing_interval - 1
 
-        callback = MagicMock()
+        callback = CallCounter()
         detector.set_detection_callback(callback)
         
         # Mock current time to be in pause window (e.g., 2 AM)
-        with patch('sound_detector.datetime') as mock_datetime:
-            mock_datetime.now.return_value.hour = 2
-            
-            # Mock pattern detection to return True (should be ignored due to pause)
-            with patch.object(detector, '_detect_pattern_similarity', return_value=True):
-                audio_data = np.random.random(1024).astype(np.float32)
-                detector.process_audio_chunk(audio_data)
-                
-                # Callback should not be called due to time-based pause
-                callback.assert_not_called()
+        detector._current_hour = lambda: 2
+        # Pattern detection always matches, so only the pause window decides whether the callback runs
+        detector._detect_pattern_similarity = lambda audio_buffer: True
+        
+        audio_data = _TINY
+        detector.process_audio_chunk(audio_data)
+        
+        # Callback should not be called due to time-based pause
+        self.assertFalse(callback.called)
 
     def test_process_audio_chunk_outside_pause_window_not_skip_detection(self):
-        detector = SoundDetector(
-            reference_audio_path=self.reference_audio_path,
+        detector = self._fresh_detector(
             enable_time_pause=True,
             pause_start_hour=22,
             pause_end_hour=8,
@@ -257,20 +630,19 @@ class TestSoundDetector(unittest.TestCase):
         detector.last_detection_time = 0
         detector.chunk_counter = detector.processing_interval - 1
 
-        callback = MagicMock()
+        callback = CallCounter()
         detector.set_detection_callback(callback)
         
-        # Mock current time to be in pause window (e.g., 2 AM)
-        with patch('sound_detector.datetime') as mock_datetime:
-            mock_datetime.now.return_value.hour = 10
-            
-            # Mock pattern detection to return True (should be ignored due to pause)
-            with patch.object(detector, '_detect_pattern_similarity', return_value=True):
-                audio_data = np.random.random(1024).astype(np.float32)
-                detector.process_audio_chunk(audio_data)
-                
-                # Callback should not be called due to time-based pause
-                callback.assert_called_once()
+        # Mock current time to be outside the pause window (10 AM)
+        detector._current_hour = lambda: 10
+        # Pattern detection always matches, so only the pause window decides whether the callback runs
+        detector._detect_pattern_similarity = lambda audio_buffer: True
+        
+        audio_data = _TINY
+        detector.process_audio_chunk(audio_data)
+        
+        # Callback should be called since detection is not paused
+        self.assertEqual(callback.count, 1)
                 
 
 if __name__ == '__main__':